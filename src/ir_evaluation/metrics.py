@@ -1,8 +1,256 @@
 import math
+from functools import lru_cache
+from itertools import islice
+
+_inv_log2: list[float] = []
+
+def _inv_log2_up_to(k: int) -> list[float]:
+  """
+  Return the cached `1/log2(i+2)` discount table, grown to at least `k` entries.
+
+  The table is shared across calls so the `log2` evaluations are paid once
+  for the largest `k` seen rather than per query.
+  """
+  while len(_inv_log2) < k:
+    _inv_log2.append(1.0 / math.log2(len(_inv_log2) + 2))
+  return _inv_log2
+
+def _to_py_list(seq, k: int | None = None):
+  """
+  Coerce array-like input (e.g. a numpy array) to a plain Python list.
+
+  Iterating an ndarray boxes every element through `ndarray.__getitem__`,
+  which dominates the hot membership loops. Converting once with `.tolist()`
+  (sliced to the top `k` when given) makes iteration homogeneous Python ints
+  that CPython's specialized bytecode handles directly. Plain lists are
+  returned unchanged.
+  """
+  if isinstance(seq, list):
+    return seq
+  tolist = getattr(seq, "tolist", None)
+  if tolist is None:
+    return seq
+  return seq[:k].tolist() if k is not None else tolist()
+
+@lru_cache(maxsize=1024)
+def _idcg(k: int, n_relevant: int) -> float:
+  """
+  Ideal DCG at rank `k` for `n_relevant` relevant items.
+
+  Depends only on `min(k, n_relevant)`, so it is cached - batch runs where
+  many queries share a ground truth size pay for each sum once.
+  """
+  m = min(k, n_relevant)
+  return sum(_inv_log2_up_to(m)[:m]) if m else 0.0
+
+# largest k for which all_metrics compiles a specialized unrolled scan
+_UNROLL_MAX_K = 64
+
+@lru_cache(maxsize=None)
+def _unrolled_scan(k: int):
+  """
+  Generate and compile a fused hit-scan specialized to a fixed `k`.
+
+  The loop over positions is unrolled into straight-line code with the
+  `1/(i+1)` and `1/log2(i+2)` factors baked in as literal constants,
+  removing the loop counter, the discount-table lookups, and the division
+  per hit. Compiled scans are cached per `k`, so repeated reports at the
+  usual cutoffs (5, 10, 20, ...) pay the codegen cost once.
+
+  The generated function requires `len(predicted) >= k`.
+  """
+  inv_log2 = _inv_log2_up_to(k)
+  lines = [
+    "def _scan(contains, predicted, n_relevant):",
+    "  hits = 0; ap_sum = 0.0; dcg = 0.0; rr = 0.0",
+  ]
+  for i in range(k):
+    lines.append(f"  if contains(predicted[{i}]):")
+    lines.append(f"    hits += 1; ap_sum += hits * {1.0 / (i + 1)!r}; dcg += {inv_log2[i]!r}")
+    if i == 0:
+      lines.append("    rr = 1.0")
+    else:
+      lines.append(f"    if rr == 0.0: rr = {1.0 / (i + 1)!r}")
+    lines.append("    if hits == n_relevant: return hits, ap_sum, dcg, rr")
+  lines.append("  return hits, ap_sum, dcg, rr")
+
+  namespace: dict = {}
+  exec("\n".join(lines), namespace)
+  return namespace["_scan"]
 
 def mean_of_list(l: list[float]) -> float:
   return sum(l) / len(l)
 
+class Evaluator:
+  """
+  Computes multiple metrics for a single query while building the ground
+  truth set only once.
+
+  Every free metric function rebuilds `set(actual)` on each call. When
+  several metrics are reported for the same query (a standard reporting
+  flow), constructing one `Evaluator` amortizes that set build across all
+  of them.
+
+  When the item IDs live in a known finite universe `[0, universe_size)`,
+  passing `universe_size` switches membership testing from hashing to a
+  dense byte bitmap - an O(1) index with no hashing overhead and cache
+  friendly access for the top-k scan.
+
+  Args:
+    actual (list[int]): An array of ground truth relevant items.
+    universe_size (int | None): Total number of distinct item IDs. When given,
+        all items in `actual` and `predicted` must be integers in
+        `[0, universe_size)` and `predicted` must not contain duplicates.
+
+  """
+
+  def __init__(self, actual: list[int], universe_size: int | None = None):
+    self.actual_set = frozenset(_to_py_list(actual))
+    self.n_relevant = len(self.actual_set)
+
+    if universe_size is None:
+      self._bitmap = None
+      self._contains = self.actual_set.__contains__
+    else:
+      bitmap = bytearray(universe_size)
+      for item in self.actual_set:
+        bitmap[item] = 1
+      self._bitmap = bitmap
+      self._contains = bitmap.__getitem__
+
+  def _count_hits(self, predicted: list[int], k: int) -> int:
+    """Count the relevant items within the top-k predictions."""
+    predicted = _to_py_list(predicted, k)
+    if self._bitmap is None:
+      return len(self.actual_set.intersection(islice(predicted, k)))
+    return sum(map(self._bitmap.__getitem__, islice(predicted, k)))
+
+  def recall(self, predicted: list[int], k: int) -> float:
+    """Calculate the recall@k metric. See `recall` for details."""
+    return self._count_hits(predicted, k) / float(self.n_relevant)
+
+  def precision(self, predicted: list[int], k: int) -> float:
+    """Calculate the precision@k metric. See `precision` for details."""
+    return self._count_hits(predicted, k) / float(k)
+
+  def f1_score(self, predicted: list[int], k: int) -> float:
+    """Calculate the F1-score @k metric. See `f1_score` for details."""
+    count_relevant_in_top_k = self._count_hits(predicted, k)
+    if count_relevant_in_top_k == 0:
+      return float(0)
+
+    recall_score = count_relevant_in_top_k / float(self.n_relevant)
+    precision_score = count_relevant_in_top_k / float(k)
+    return 2 * (recall_score * precision_score) / (recall_score + precision_score)
+
+  def average_precision(self, predicted: list[int], k: int, divide_by_relevant: bool = False) -> float:
+    """Computes the Average Precision at rank `k`. See `average_precision` for details."""
+    predicted = _to_py_list(predicted, k)
+    contains = self._contains
+    n_relevant = self.n_relevant
+    hits = 0
+    ap_sum = 0.0
+
+    for i, p in enumerate(islice(predicted, k)):
+      if contains(p):
+        hits += 1
+        ap_sum += hits / (i + 1)
+        if hits == n_relevant:
+          # all relevant items found; the remaining positions contribute nothing
+          break
+
+    denominator = min(k, self.n_relevant) if divide_by_relevant else hits
+    if denominator == 0:
+      return float(0)
+
+    return ap_sum / denominator
+
+  def ndcg(self, predicted: list[int], k: int) -> float:
+    """Computes the Normalized Discounted Cumulative Gain at rank `k`. See `ndcg` for details."""
+    # ideal discounted cumulative gain (ie. perfect results returned)
+    idcg = _idcg(k, self.n_relevant)
+    if idcg == 0.0:
+      return float(0)
+
+    predicted = _to_py_list(predicted, k)
+    inv_log2 = _inv_log2_up_to(k)
+    contains = self._contains
+
+    # discounted cumulative gain
+    dcg = sum(inv_log2[i] for i, p in enumerate(islice(predicted, k)) if contains(p))
+    return dcg / idcg
+
+  def reciprocal_rank(self, predicted: list[int], k: int) -> float:
+    """Computes the Reciprocal Rank at rank `k`. See `reciprocal_rank` for details."""
+    predicted = _to_py_list(predicted, k)
+    contains = self._contains
+    return next((1.0 / (i + 1) for i, p in enumerate(islice(predicted, k)) if contains(p)), float(0))
+
+  def all_metrics(self, predicted: list[int], k: int, divide_by_relevant: bool = False) -> dict[str, float]:
+    """
+    Computes every metric in a single pass over the top-k predictions.
+
+    Computing the metrics individually scans `predicted[:k]` once per metric.
+    This fused version maintains the hit count, AP sum, DCG, and first-hit
+    rank in one traversal, so a full report costs one scan instead of five.
+
+    Args:
+      predicted (list[int]): An array of predicted items, ordered by relevance.
+      k (int): The number of top predictions to consider.
+      divide_by_relevant (bool): Passed through to the Average Precision
+          normalization. See `average_precision`.
+
+    Returns:
+      dict[str, float]: The scores keyed by metric name: "recall",
+      "precision", "f1_score", "average_precision", "ndcg", and
+      "reciprocal_rank".
+    """
+    predicted = _to_py_list(predicted, k)
+    contains = self._contains
+    n_relevant = self.n_relevant
+
+    if k <= _UNROLL_MAX_K and len(predicted) >= k:
+      hits, ap_sum, dcg, rr = _unrolled_scan(k)(contains, predicted, n_relevant)
+    else:
+      inv_log2 = _inv_log2_up_to(k)
+      hits = 0
+      ap_sum = 0.0
+      dcg = 0.0
+      rr = 0.0
+
+      for i, p in enumerate(islice(predicted, k)):
+        if contains(p):
+          hits += 1
+          ap_sum += hits / (i + 1)
+          dcg += inv_log2[i]
+          if rr == 0.0:
+            rr = 1.0 / (i + 1)
+          if hits == n_relevant:
+            # all relevant items found; no accumulator can grow further
+            break
+
+    recall_score = hits / float(self.n_relevant)
+    precision_score = hits / float(k)
+    if hits == 0:
+      f1 = 0.0
+    else:
+      f1 = 2 * (recall_score * precision_score) / (recall_score + precision_score)
+
+    ap_denominator = min(k, self.n_relevant) if divide_by_relevant else hits
+    ap = ap_sum / ap_denominator if ap_denominator else 0.0
+
+    idcg = _idcg(k, self.n_relevant)
+    ndcg_score = dcg / idcg if idcg else 0.0
+
+    return {
+      "recall": recall_score,
+      "precision": precision_score,
+      "f1_score": f1,
+      "average_precision": ap,
+      "ndcg": ndcg_score,
+      "reciprocal_rank": rr,
+    }
+
 def recall(actual: list[int], predicted: list[int], k: int) -> float:
   """
   Calculate the recall@k metric.
@@ -24,10 +272,7 @@ def recall(actual: list[int], predicted: list[int], k: int) -> float:
     - This function assumes the `predicted` array is sorted in descending order of relevance.
     - If k is larger than the length of the `predicted` array, it will consider the entire array.
   """
-  actual_set = set(actual)
-  top_k_predictions = set(predicted[:k])
-  count_relevant_in_top_k = len(actual_set.intersection(top_k_predictions))
-  return count_relevant_in_top_k / float(len(actual_set))
+  return Evaluator(actual).recall(predicted, k)
 
 def precision(actual: list[int], predicted: list[int], k: int) -> float:
   """
@@ -51,10 +296,7 @@ def precision(actual: list[int], predicted: list[int], k: int) -> float:
     - This function assumes the `predicted` array is sorted in descending order of relevance.
     - If k is larger than the length of the `predicted` array, it will consider the entire array.
   """
-  actual_set = set(actual)
-  top_k_predictions = set(predicted[:k])
-  count_relevant_in_top_k = len(actual_set.intersection(top_k_predictions))
-  return count_relevant_in_top_k / float(k)
+  return Evaluator(actual).precision(predicted, k)
 
 def f1_score(actual: list[int], predicted: list[int], k: int) -> float:
   """
@@ -74,51 +316,49 @@ def f1_score(actual: list[int], predicted: list[int], k: int) -> float:
     float: The F1 score value at rank k, ranging from 0 to 1.
            A value of 1 indicates perfect precision and recall, while 0 indicates either precision or recall is zero.
   """
-  recall_score = recall(actual, predicted, k)
-  precision_score = precision(actual, predicted, k)
-
-  if recall_score == 0  or precision_score == 0:
-    return float(0)
-
-  return 2 * (recall_score * precision_score) / (recall_score + precision_score)
+  return Evaluator(actual).f1_score(predicted, k)
 
-def average_precision(actual: list[int], predicted: list[int], k: int) -> float:
+def average_precision(actual: list[int], predicted: list[int], k: int, divide_by_relevant: bool = False) -> float:
   """
   Computes the Average Precision (AP) at a specified rank `k`.
 
-  Average Precision (AP) is a metric used to evaluate the relevance of predicted rankings 
-  in information retrieval tasks. It is calculated as the mean of precision values at 
+  Average Precision (AP) is a metric used to evaluate the relevance of predicted rankings
+  in information retrieval tasks. It is calculated as the mean of precision values at
   each rank where a relevant item is retrieved within the top `k` predictions.
 
+  The precision at each rank is computed incrementally in a single pass over the
+  predictions, maintaining a running count of hits.
+
   Args:
       actual (list[int]): A list of integers representing the ground truth relevant items.
       predicted (list[int]): A list of integers representing the predicted rankings of items.
       k (int): The maximum number of top-ranked items to consider for evaluation.
+      divide_by_relevant (bool): If True, divide the sum of precision values by
+          `min(k, len(actual))` (the IR-standard AP@k denominator) instead of the
+          number of relevant items retrieved. Defaults to False.
 
   Returns:
-      float: The Average Precision score. If no relevant items are retrieved within the
-      top `k` predictions, the function may raise a division by zero error or return `NaN`.
+      float: The Average Precision score. Returns 0 if no relevant items are retrieved
+      within the top `k` predictions.
   """
-  actual_set = set(actual)
-  precision_list = [precision(actual, predicted, i+1) for i in range(k) if predicted[i] in actual_set]
-  return mean_of_list(precision_list)
+  return Evaluator(actual).average_precision(predicted, k, divide_by_relevant)
 
 def mean_average_precision(actual_list: list[list[int]], predicted_list: list[list[int]], k: int) -> float:
   """
   Computes the Mean Average Precision (MAP) at a specified rank `k`.
 
-  It is the mean of the Average Precision (AP) scores computed for multiple 
+  It is the mean of the Average Precision (AP) scores computed for multiple
   queries.
 
   Args:
-      actual_list (list[list[int]]): A list of lists where each inner list represents 
+      actual_list (list[list[int]]): A list of lists where each inner list represents
           the ground truth relevant items for a query
-      predicted_list (list[list[int]]): A list of lists where each inner list represents 
+      predicted_list (list[list[int]]): A list of lists where each inner list represents
           the predicted rankings of items for a query
       k (int): The maximum number of top-ranked items to consider for each prediction.
 
   Returns:
-      float: The Mean Average Precision score, which is the mean of AP scores across all 
+      float: The Mean Average Precision score, which is the mean of AP scores across all
       queries.
 
   Raises:
@@ -127,15 +367,17 @@ def mean_average_precision(actual_list: list[list[int]], predicted_list: list[li
 
   assert len(actual_list) == len(predicted_list)
 
-  ap_values = [average_precision(actual_list[i], predicted_list[i], k) for i in range(len(actual_list))]
-  return mean_of_list(ap_values) 
+  total = 0.0
+  for actual, predicted in zip(actual_list, predicted_list):
+    total += Evaluator(actual).average_precision(predicted, k)
+  return total / len(actual_list)
 
 def ndcg(actual: list[int], predicted: list[int], k: int) -> float:
   """
   Computes the Normalized Discounted Cumulative Gain (nDCG) at a specified rank `k`.
 
-  nDCG evaluates the quality of a predicted ranking by comparing it to an ideal ranking 
-  (i.e., perfect ordering of relevant items). It accounts for the position of relevant 
+  nDCG evaluates the quality of a predicted ranking by comparing it to an ideal ranking
+  (i.e., perfect ordering of relevant items). It accounts for the position of relevant
   items in the ranking, giving higher weight to items appearing earlier.
 
   Args:
@@ -144,18 +386,11 @@ def ndcg(actual: list[int], predicted: list[int], k: int) -> float:
       k (int): The maximum number of top-ranked items to consider for evaluation.
 
   Returns:
-      float: The nDCG score, which ranges from 0 to 1. A value of 1 indicates a perfect 
-      ranking. Returns 0 if there are no relevant items in the top `k` predictions or if 
+      float: The nDCG score, which ranges from 0 to 1. A value of 1 indicates a perfect
+      ranking. Returns 0 if there are no relevant items in the top `k` predictions or if
       the ideal DCG (iDCG) is zero.
   """
-  actual_set = set(actual)
-
-  # discounted cumulative gain
-  # `i+2` due to zero indexing
-  dcg = sum([1.0/math.log2(i+2) for i in range(k) if predicted[i] in actual_set])
-  # ideal discounted cumulative gain (ie. perfect results returned)
-  idcg = sum([1.0/math.log2(i+2) for i in range(min(k, len(actual_set)))])
-  return dcg / idcg
+  return Evaluator(actual).ndcg(predicted, k)
 
 def reciprocal_rank(actual: list[int], predicted: list[int], k: int) -> float:
   """
@@ -169,23 +404,37 @@ def reciprocal_rank(actual: list[int], predicted: list[int], k: int) -> float:
       k (int): The maximum number of top-ranked items to consider for evaluation.
 
   Returns:
-      float: The Reciprocal Rank score. A value of 0 is returned if no relevant items are 
-      found within the top `k` predictions. Otherwise, the score is `1 / rank`, where 
+      float: The Reciprocal Rank score. A value of 0 is returned if no relevant items are
+      found within the top `k` predictions. Otherwise, the score is `1 / rank`, where
       `rank` is the position (1-based) of the first relevant item.
 
   Notes:
       - The function assumes zero-based indexing for the `predicted` list.
-      - If `k` exceeds the length of `predicted`, only the available elements in `predicted` 
+      - If `k` exceeds the length of `predicted`, only the available elements in `predicted`
         are considered.
       - This metric focuses only on the rank of the first relevant item, ignoring others.
   """
-  actual_set = set(actual)
+  return Evaluator(actual).reciprocal_rank(predicted, k)
 
-  for i in range(k):
-    if predicted[i] in actual_set:
-      return 1 / float(i + 1)
-  
-  return float(0)
+def all_metrics(actual: list[int], predicted: list[int], k: int, divide_by_relevant: bool = False) -> dict[str, float]:
+  """
+  Computes every metric for a query in a single pass over the top-k predictions.
+
+  See `Evaluator.all_metrics` for details.
+
+  Args:
+    actual (list[int]): An array of ground truth relevant items.
+    predicted (list[int]): An array of predicted items, ordered by relevance.
+    k (int): The number of top predictions to consider.
+    divide_by_relevant (bool): Passed through to the Average Precision
+        normalization. See `average_precision`.
+
+  Returns:
+    dict[str, float]: The scores keyed by metric name: "recall",
+    "precision", "f1_score", "average_precision", "ndcg", and
+    "reciprocal_rank".
+  """
+  return Evaluator(actual).all_metrics(predicted, k, divide_by_relevant)
 
 def mean_reciprocal_rank(actual_list: list[list[int]], predicted_list: list[list[int]], k: int) -> float:
   """
@@ -194,14 +443,14 @@ def mean_reciprocal_rank(actual_list: list[list[int]], predicted_list: list[list
   It calculates the mean of the Reciprocal Rank (RR) scores for a set of queries.
 
   Args:
-      actual_list (list[list[int]]): A list of lists where each inner list represents the 
+      actual_list (list[list[int]]): A list of lists where each inner list represents the
           ground truth relevant items for a query or task.
-      predicted_list (list[list[int]]): A list of lists where each inner list represents 
+      predicted_list (list[list[int]]): A list of lists where each inner list represents
           the predicted rankings of items for a query or task.
       k (int): The maximum number of top-ranked items to consider for each prediction.
 
   Returns:
-      float: The Mean Reciprocal Rank score, which is the average of RR scores across all 
+      float: The Mean Reciprocal Rank score, which is the average of RR scores across all
       queries. Returns 0 if there are no queries or no relevant items in any predictions.
 
   Raises:
@@ -210,5 +459,7 @@ def mean_reciprocal_rank(actual_list: list[list[int]], predicted_list: list[list
 
   assert len(actual_list) == len(predicted_list)
 
-  rr_values = [reciprocal_rank(actual_list[i], predicted_list[i], k) for i in range(len(actual_list))]
-  return mean_of_list(rr_values)
+  total = 0.0
+  for actual, predicted in zip(actual_list, predicted_list):
+    total += Evaluator(actual).reciprocal_rank(predicted, k)
+  return total / len(actual_list)
@@ -0,0 +1,304 @@
+"""
+NumPy-accelerated batch metrics.
+
+This module is optional and requires `numpy` to be installed
+(`pip install ir_evaluation[numpy]`). The core `ir_evaluation.metrics`
+module remains dependency-free.
+
+The batch functions here accept predictions stacked into a single 2D
+array of shape (Q, k) - one row per query - instead of a list of lists.
+The ragged ground truth can likewise be passed in a CSR-style
+structure-of-arrays layout (`actual_flat` plus `actual_offsets`) via the
+`*_soa` variants; the `list[list[int]]` functions pack into that layout
+once and delegate. Membership, cumulative precision, and the final
+reduction all run as C-level NumPy kernels rather than per-query Python
+loops.
+"""
+
+import numpy as np
+
+def _pack_actual(actual_list: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Pack ragged ground truth lists into CSR-style `(actual_flat, actual_offsets)`
+  arrays: all items concatenated, with `actual_offsets[q]:actual_offsets[q+1]`
+  delimiting query q.
+  """
+  q_count = len(actual_list)
+  lengths = np.fromiter((len(a) for a in actual_list), dtype=np.int64, count=q_count)
+  offsets = np.zeros(q_count + 1, dtype=np.int64)
+  np.cumsum(lengths, out=offsets[1:])
+  if q_count:
+    flat = np.concatenate([np.asarray(a, dtype=np.int64) for a in actual_list])
+  else:
+    flat = np.empty(0, dtype=np.int64)
+  return flat, offsets
+
+def _build_bitset_matrix(actual_flat: np.ndarray, actual_offsets: np.ndarray, universe_size: int) -> np.ndarray:
+  """
+  Pack every query's relevant IDs into one row of a (Q, words) uint64 bitset
+  matrix, so the whole batch can be tested with a single gather.
+  """
+  q_count = actual_offsets.size - 1
+  bits = np.zeros((q_count, (universe_size + 63) // 64), dtype=np.uint64)
+  flat = np.asarray(actual_flat, dtype=np.int64)
+  rows = np.repeat(np.arange(q_count), np.diff(actual_offsets))
+  np.bitwise_or.at(bits, (rows, flat >> 6), np.left_shift(np.uint64(1), (flat & 63).astype(np.uint64)))
+  return bits
+
+def _hit_matrix_soa(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int, universe_size: int | None = None) -> np.ndarray:
+  """
+  Build a boolean hit matrix for a batch of queries in the SoA layout.
+
+  Args:
+    actual_flat (np.ndarray): All ground truth relevant items concatenated
+        into a single int array.
+    actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1.
+    predicted (np.ndarray): A 2D array of shape (Q, k) of predicted items,
+        one row per query, ordered by relevance.
+    k (int): The number of top predictions to consider.
+    universe_size (int | None): Total number of distinct item IDs. When given,
+        all IDs must be integers in `[0, universe_size)` and membership is
+        tested against a packed bitset matrix with one gather for the whole
+        batch instead of `np.isin` per query.
+
+  Returns:
+    np.ndarray: A boolean array of shape (Q, min(k, predicted.shape[1]))
+        where entry [q, i] is True if `predicted[q, i]` is relevant for query q.
+  """
+  predicted = np.asarray(predicted)[:, :k]
+
+  if universe_size is None:
+    hits = np.empty(predicted.shape, dtype=np.bool_)
+    for q in range(predicted.shape[0]):
+      hits[q] = np.isin(predicted[q], actual_flat[actual_offsets[q]:actual_offsets[q + 1]])
+    return hits
+
+  bits = _build_bitset_matrix(actual_flat, actual_offsets, universe_size)
+  pred = predicted.astype(np.int64)
+  rows = np.arange(pred.shape[0])[:, None]
+  return ((bits[rows, pred >> 6] >> (pred & 63).astype(np.uint64)) & np.uint64(1)).astype(np.bool_)
+
+def _sorted_hit_mask(actual_sorted: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+  """
+  Boolean hit mask for `predicted` via binary search on sorted unique `actual`.
+
+  Stays entirely in C: one `np.searchsorted` over the predictions plus a
+  vectorized equality check, with no boxing of array elements into Python
+  ints or sets.
+  """
+  if actual_sorted.size == 0:
+    return np.zeros(predicted.shape, dtype=np.bool_)
+  idx = np.searchsorted(actual_sorted, predicted)
+  return (idx < actual_sorted.size) & (actual_sorted[np.clip(idx, 0, actual_sorted.size - 1)] == predicted)
+
+def recall(actual: np.ndarray, predicted: np.ndarray, k: int) -> float:
+  """
+  Calculate the recall@k metric for ndarray inputs.
+
+  Equivalent to `metrics.recall`, but keeps the membership test in C by
+  sorting `actual` once and binary-searching the top-k predictions, instead
+  of round-tripping the arrays through Python sets.
+
+  Args:
+    actual (np.ndarray): An array of ground truth relevant items.
+    predicted (np.ndarray): An array of predicted items, ordered by relevance.
+    k (int): The number of top predictions to consider.
+
+  Returns:
+    float: The recall value at rank k, ranging from 0 to 1.
+  """
+  actual_sorted = np.unique(np.asarray(actual))
+  hits = _sorted_hit_mask(actual_sorted, np.asarray(predicted)[:k])
+  return float(hits.sum() / actual_sorted.size)
+
+def precision(actual: np.ndarray, predicted: np.ndarray, k: int) -> float:
+  """
+  Calculate the precision@k metric for ndarray inputs.
+
+  Equivalent to `metrics.precision`, but keeps the membership test in C by
+  sorting `actual` once and binary-searching the top-k predictions, instead
+  of round-tripping the arrays through Python sets.
+
+  Args:
+    actual (np.ndarray): An array of ground truth relevant items.
+    predicted (np.ndarray): An array of predicted items, ordered by relevance.
+    k (int): The number of top predictions to consider.
+
+  Returns:
+    float: The precision value at rank k, ranging from 0 to 1.
+  """
+  actual_sorted = np.unique(np.asarray(actual))
+  hits = _sorted_hit_mask(actual_sorted, np.asarray(predicted)[:k])
+  return float(hits.sum() / k)
+
+def average_precision(actual: np.ndarray, predicted: np.ndarray, k: int, divide_by_relevant: bool = False) -> float:
+  """
+  Computes the Average Precision (AP) at a specified rank `k` for ndarray
+  inputs.
+
+  Equivalent to `metrics.average_precision`, but expresses the metric as
+  `(hits.cumsum() / ranks * hits).sum() / denominator` over a vectorized hit
+  mask - three C-level kernels instead of k Python iterations.
+
+  Args:
+      actual (np.ndarray): An array of ground truth relevant items.
+      predicted (np.ndarray): An array of predicted items, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for evaluation.
+      divide_by_relevant (bool): If True, divide the sum of precision values by
+          `min(k, len(actual))` (the IR-standard AP@k denominator) instead of
+          the number of relevant items retrieved. Defaults to False.
+
+  Returns:
+      float: The Average Precision score. Returns 0 if no relevant items are
+      retrieved within the top `k` predictions.
+  """
+  actual_sorted = np.unique(np.asarray(actual))
+  hits = _sorted_hit_mask(actual_sorted, np.asarray(predicted)[:k])
+  ap = _ap_scores(hits[None, :], k, np.array([actual_sorted.size]), divide_by_relevant)
+  return float(ap[0])
+
+def _ap_scores(hits: np.ndarray, k: int, n_relevant: np.ndarray, divide_by_relevant: bool) -> np.ndarray:
+  """
+  Derive per-query Average Precision scores from a boolean hit matrix.
+  """
+  # the (Q, k) intermediates are float32 - precision at a rank never exceeds
+  # 1 and tolerates ~1e-7 error, and the narrower dtype halves the memory
+  # traffic of the largest temporaries; the reductions run in float64
+  ranks = np.arange(1, hits.shape[1] + 1, dtype=np.float32)
+  prec_at_i = hits.cumsum(axis=1, dtype=np.float32) / ranks
+
+  if divide_by_relevant:
+    denominator = np.minimum(k, n_relevant).clip(min=1)
+  else:
+    denominator = hits.sum(axis=1).clip(min=1)
+
+  return (prec_at_i * hits).sum(axis=1, dtype=np.float64) / denominator
+
+def _rr_scores(hits: np.ndarray) -> np.ndarray:
+  """
+  Derive per-query Reciprocal Rank scores from a boolean hit matrix.
+  """
+  first_hit = hits.argmax(axis=1)
+  return np.where(hits.any(axis=1), 1.0 / (first_hit + 1), 0.0)
+
+def mean_average_precision_soa(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int, universe_size: int | None = None, divide_by_relevant: bool = False) -> float:
+  """
+  Computes the Mean Average Precision (MAP) at a specified rank `k` for a
+  batch of queries in the CSR-style structure-of-arrays layout.
+
+  This is the fastest entry point for large batches: both inputs are
+  contiguous arrays, so no per-query Python objects are touched.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array. Items must be unique within each query.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+      universe_size (int | None): Total number of distinct item IDs. When given,
+          membership is tested against a packed bitset matrix; all IDs must be
+          integers in `[0, universe_size)`.
+      divide_by_relevant (bool): If True, divide each query's sum of precision
+          values by `min(k, len(actual))` (the IR-standard AP@k denominator)
+          instead of the number of relevant items retrieved. Defaults to False.
+
+  Returns:
+      float: The Mean Average Precision score across all queries. Queries with
+      no relevant items retrieved contribute 0.
+  """
+  actual_offsets = np.asarray(actual_offsets)
+  hits = _hit_matrix_soa(actual_flat, actual_offsets, predicted, k, universe_size)
+  ap = _ap_scores(hits, k, np.diff(actual_offsets), divide_by_relevant)
+  return float(ap.mean())
+
+def mean_reciprocal_rank_soa(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int, universe_size: int | None = None) -> float:
+  """
+  Computes the Mean Reciprocal Rank (MRR) at a specified rank `k` for a
+  batch of queries in the CSR-style structure-of-arrays layout.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+      universe_size (int | None): Total number of distinct item IDs. When given,
+          membership is tested against a packed bitset matrix; all IDs must be
+          integers in `[0, universe_size)`.
+
+  Returns:
+      float: The Mean Reciprocal Rank score across all queries. Queries with
+      no relevant items retrieved contribute 0.
+  """
+  actual_offsets = np.asarray(actual_offsets)
+  hits = _hit_matrix_soa(actual_flat, actual_offsets, predicted, k, universe_size)
+  return float(_rr_scores(hits).mean())
+
+def mean_average_precision(actual_list: list[list[int]], predicted: np.ndarray, k: int, universe_size: int | None = None, divide_by_relevant: bool = False) -> float:
+  """
+  Computes the Mean Average Precision (MAP) at a specified rank `k` for a
+  batch of queries, vectorized with NumPy.
+
+  Equivalent to `metrics.mean_average_precision`, but takes the predictions
+  as a stacked 2D array. The ragged `actual_list` is packed once into the
+  structure-of-arrays layout and handed to `mean_average_precision_soa`.
+
+  Args:
+      actual_list (list[list[int]]): Ground truth relevant items per query.
+      predicted (np.ndarray): A 2D array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+      universe_size (int | None): Total number of distinct item IDs. When given,
+          membership is tested against a packed bitset matrix; all IDs must be
+          integers in `[0, universe_size)`.
+      divide_by_relevant (bool): If True, divide each query's sum of precision
+          values by `min(k, len(actual))` (the IR-standard AP@k denominator)
+          instead of the number of relevant items retrieved. Defaults to False.
+
+  Returns:
+      float: The Mean Average Precision score across all queries. Queries with
+      no relevant items retrieved contribute 0.
+
+  Raises:
+      AssertionError: If the number of rows in `predicted` does not match
+      the length of `actual_list`.
+  """
+  assert len(actual_list) == len(predicted)
+
+  actual_flat, actual_offsets = _pack_actual(actual_list)
+  return mean_average_precision_soa(actual_flat, actual_offsets, predicted, k, universe_size, divide_by_relevant)
+
+def mean_reciprocal_rank(actual_list: list[list[int]], predicted: np.ndarray, k: int, universe_size: int | None = None) -> float:
+  """
+  Computes the Mean Reciprocal Rank (MRR) at a specified rank `k` for a
+  batch of queries, vectorized with NumPy.
+
+  Equivalent to `metrics.mean_reciprocal_rank`, but takes the predictions
+  as a stacked 2D array. The ragged `actual_list` is packed once into the
+  structure-of-arrays layout and handed to `mean_reciprocal_rank_soa`.
+
+  Args:
+      actual_list (list[list[int]]): Ground truth relevant items per query.
+      predicted (np.ndarray): A 2D array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+      universe_size (int | None): Total number of distinct item IDs. When given,
+          membership is tested against a packed bitset matrix; all IDs must be
+          integers in `[0, universe_size)`.
+
+  Returns:
+      float: The Mean Reciprocal Rank score across all queries. Queries with
+      no relevant items retrieved contribute 0.
+
+  Raises:
+      AssertionError: If the number of rows in `predicted` does not match
+      the length of `actual_list`.
+  """
+  assert len(actual_list) == len(predicted)
+
+  actual_flat, actual_offsets = _pack_actual(actual_list)
+  return mean_reciprocal_rank_soa(actual_flat, actual_offsets, predicted, k, universe_size)
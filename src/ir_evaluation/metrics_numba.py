@@ -0,0 +1,232 @@
+"""
+Numba-accelerated batch kernels.
+
+This module is optional and requires `numpy`; `numba` is used when it is
+installed, otherwise the kernels run as plain Python/NumPy code. Setting
+`NUMBA_DISABLE_JIT=1` is also honored by numba itself, so the same code
+path stays usable for debugging.
+
+The kernels take the batch in a flat CSR-style layout: all ground truth
+items concatenated into `actual_flat` with `actual_offsets` marking the
+per-query boundaries, and the predictions stacked into a 2D int32 array
+of shape (Q, k). Each query is independent, so the jitted kernels
+parallelize across queries with `prange`.
+"""
+
+import numpy as np
+
+try:
+  from numba import njit, prange
+except ImportError:
+  prange = range
+
+  def njit(*args, **kwargs):
+    def passthrough(func):
+      return func
+    return passthrough
+
+@njit(parallel=True, cache=True)
+def _ap_batch(actual_flat, actual_offsets, predicted, k):
+  q_count = predicted.shape[0]
+  width = min(k, predicted.shape[1])
+  out = np.zeros(q_count, dtype=np.float32)
+
+  for q in prange(q_count):
+    sorted_actual = np.sort(actual_flat[actual_offsets[q]:actual_offsets[q + 1]])
+    hits = 0
+    ap_sum = 0.0
+    for i in range(width):
+      p = predicted[q, i]
+      idx = np.searchsorted(sorted_actual, p)
+      if idx < sorted_actual.size and sorted_actual[idx] == p:
+        hits += 1
+        ap_sum += hits / (i + 1)
+    if hits > 0:
+      out[q] = ap_sum / hits
+
+  return out
+
+@njit(parallel=True, cache=True)
+def _ndcg_batch(actual_flat, actual_offsets, predicted, k, inv_log2):
+  q_count = predicted.shape[0]
+  width = min(k, predicted.shape[1])
+  out = np.zeros(q_count, dtype=np.float32)
+
+  for q in prange(q_count):
+    sorted_actual = np.sort(actual_flat[actual_offsets[q]:actual_offsets[q + 1]])
+    dcg = 0.0
+    for i in range(width):
+      p = predicted[q, i]
+      idx = np.searchsorted(sorted_actual, p)
+      if idx < sorted_actual.size and sorted_actual[idx] == p:
+        dcg += inv_log2[i]
+    idcg = 0.0
+    for i in range(min(k, sorted_actual.size)):
+      idcg += inv_log2[i]
+    if idcg > 0.0:
+      out[q] = dcg / idcg
+
+  return out
+
+@njit(parallel=True, cache=True)
+def _all_metrics_batch(actual_flat, actual_offsets, predicted, k, inv_log2):
+  q_count = predicted.shape[0]
+  width = min(k, predicted.shape[1])
+  # columns: recall, precision, f1_score, average_precision, ndcg, reciprocal_rank
+  out = np.zeros((q_count, 6), dtype=np.float32)
+
+  for q in prange(q_count):
+    sorted_actual = np.sort(actual_flat[actual_offsets[q]:actual_offsets[q + 1]])
+    n_relevant = sorted_actual.size
+    hits = 0
+    ap_sum = 0.0
+    dcg = 0.0
+    rr = 0.0
+    for i in range(width):
+      p = predicted[q, i]
+      idx = np.searchsorted(sorted_actual, p)
+      if idx < n_relevant and sorted_actual[idx] == p:
+        hits += 1
+        ap_sum += hits / (i + 1)
+        dcg += inv_log2[i]
+        if rr == 0.0:
+          rr = 1.0 / (i + 1)
+        if hits == n_relevant:
+          break
+
+    recall = hits / n_relevant if n_relevant else 0.0
+    precision = hits / k
+    out[q, 0] = recall
+    out[q, 1] = precision
+    if hits > 0:
+      out[q, 2] = 2 * (recall * precision) / (recall + precision)
+      out[q, 3] = ap_sum / hits
+      out[q, 5] = rr
+    idcg = 0.0
+    for i in range(min(k, n_relevant)):
+      idcg += inv_log2[i]
+    if idcg > 0.0:
+      out[q, 4] = dcg / idcg
+
+  return out
+
+@njit(parallel=True, cache=True)
+def _rr_batch(actual_flat, actual_offsets, predicted, k):
+  q_count = predicted.shape[0]
+  width = min(k, predicted.shape[1])
+  out = np.zeros(q_count, dtype=np.float32)
+
+  for q in prange(q_count):
+    sorted_actual = np.sort(actual_flat[actual_offsets[q]:actual_offsets[q + 1]])
+    for i in range(width):
+      p = predicted[q, i]
+      idx = np.searchsorted(sorted_actual, p)
+      if idx < sorted_actual.size and sorted_actual[idx] == p:
+        out[q] = 1.0 / (i + 1)
+        break
+
+  return out
+
+def _as_kernel_inputs(actual_flat, actual_offsets, predicted):
+  actual_flat = np.ascontiguousarray(actual_flat, dtype=np.int32)
+  actual_offsets = np.ascontiguousarray(actual_offsets, dtype=np.int32)
+  predicted = np.ascontiguousarray(predicted, dtype=np.int32)
+  return actual_flat, actual_offsets, predicted
+
+def ap_batch(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int) -> np.ndarray:
+  """
+  Computes the Average Precision at rank `k` for every query in a batch.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D int array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+
+  Returns:
+      np.ndarray: A float32 array of length Q with one AP score per query.
+      Queries with no relevant items retrieved score 0.
+  """
+  actual_flat, actual_offsets, predicted = _as_kernel_inputs(actual_flat, actual_offsets, predicted)
+  return _ap_batch(actual_flat, actual_offsets, predicted, np.int32(k))
+
+def ndcg_batch(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int) -> np.ndarray:
+  """
+  Computes the Normalized Discounted Cumulative Gain at rank `k` for every
+  query in a batch.
+
+  The `1/log2(i+2)` discount table is precomputed once outside the kernel
+  and shared across all queries.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D int array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+
+  Returns:
+      np.ndarray: A float32 array of length Q with one nDCG score per query.
+      Queries with an ideal DCG of zero score 0.
+  """
+  actual_flat, actual_offsets, predicted = _as_kernel_inputs(actual_flat, actual_offsets, predicted)
+  # length k (not the possibly narrower prediction width) so the kernel can
+  # form the ideal DCG denominator over min(k, n_relevant)
+  inv_log2 = 1.0 / np.log2(np.arange(2, k + 2, dtype=np.float64))
+  return _ndcg_batch(actual_flat, actual_offsets, predicted, np.int32(k), inv_log2)
+
+def all_metrics_batch(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int) -> dict[str, np.ndarray]:
+  """
+  Computes every metric for every query in a batch with a single fused scan.
+
+  The inner loop scans each query's top-k predictions exactly once,
+  maintaining the hit count, AP sum, DCG, and first-hit rank, and derives
+  all six scores from them - the same fusion as `metrics.all_metrics`, but
+  compiled and parallelized across queries.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D int array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+
+  Returns:
+      dict[str, np.ndarray]: Float32 arrays of length Q keyed by metric name:
+      "recall", "precision", "f1_score", "average_precision", "ndcg", and
+      "reciprocal_rank".
+  """
+  actual_flat, actual_offsets, predicted = _as_kernel_inputs(actual_flat, actual_offsets, predicted)
+  # length k (not the possibly narrower prediction width) so the kernel can
+  # form the ideal DCG denominator over min(k, n_relevant)
+  inv_log2 = 1.0 / np.log2(np.arange(2, k + 2, dtype=np.float64))
+  out = _all_metrics_batch(actual_flat, actual_offsets, predicted, np.int32(k), inv_log2)
+  names = ("recall", "precision", "f1_score", "average_precision", "ndcg", "reciprocal_rank")
+  return {name: out[:, col] for col, name in enumerate(names)}
+
+def rr_batch(actual_flat: np.ndarray, actual_offsets: np.ndarray, predicted: np.ndarray, k: int) -> np.ndarray:
+  """
+  Computes the Reciprocal Rank at rank `k` for every query in a batch.
+
+  Args:
+      actual_flat (np.ndarray): All ground truth relevant items concatenated
+          into a single int array.
+      actual_offsets (np.ndarray): Offsets into `actual_flat`, of length Q+1;
+          query q's relevant items are `actual_flat[actual_offsets[q]:actual_offsets[q+1]]`.
+      predicted (np.ndarray): A 2D int array of shape (Q, k) of predicted items,
+          one row per query, ordered by relevance.
+      k (int): The maximum number of top-ranked items to consider for each query.
+
+  Returns:
+      np.ndarray: A float32 array of length Q with one RR score per query.
+      Queries with no relevant items retrieved score 0.
+  """
+  actual_flat, actual_offsets, predicted = _as_kernel_inputs(actual_flat, actual_offsets, predicted)
+  return _rr_batch(actual_flat, actual_offsets, predicted, np.int32(k))
@@ -0,0 +1,166 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ir_evaluation import metrics_np
+
+class TestMeanAveragePrecision:
+  def test_mean_average_precision_basic(self):
+    # same inputs as the pure python test
+    actual_list = [
+      [1,3,5],
+      [2,4,6],
+      [7,8,9]
+    ]
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3]
+    ])
+    result = metrics_np.mean_average_precision(actual_list, predicted, 5)
+    # ap values: [0.7555555555555555, 0.5, 0.41666666666666663]
+    assert result == pytest.approx(0.5574074074074074)
+
+  def test_mean_average_precision_no_hits(self):
+    actual_list = [
+      [1,3,5],
+      [6,7,8]
+    ]
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [1,2,3,4,5]
+    ])
+    result = metrics_np.mean_average_precision(actual_list, predicted, 5)
+    # ap values: [0.7555555555555555, 0.0]
+    assert result == pytest.approx(0.37777777777777777)
+
+  def test_mean_average_precision_divide_by_relevant(self):
+    from ir_evaluation.metrics import average_precision
+
+    actual_list = [
+      [1,3,5],
+      [2,4,6],
+      [7,8,9]
+    ]
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3]
+    ])
+    result = metrics_np.mean_average_precision(actual_list, predicted, 5, divide_by_relevant=True)
+    expected = sum(
+      average_precision(a, list(p), 5, divide_by_relevant=True)
+      for a, p in zip(actual_list, predicted)
+    ) / len(actual_list)
+    assert result == pytest.approx(expected)
+
+class TestRecallPrecision:
+  # same sample data as the pure python tests
+  actual = np.array([ 4, 79, 32, 45, 14, 46, 53, 15,  3, 54, 68, 99, 75, 82, 35, 27, 73,
+      20, 25, 66, 11, 58, 31, 8, 85])
+  predicted = np.array([1, 2, 62, 84, 3, 4, 81, 14, 5, 67])
+
+  def test_recall_k_10(self):
+    result = metrics_np.recall(self.actual, self.predicted, 10)
+    assert result == pytest.approx(0.12) # 3 out of 25
+
+  def test_recall_zero(self):
+    result = metrics_np.recall(self.actual, np.array([5,6,7,9,10]), 5)
+    assert result == pytest.approx(0.0)
+
+  def test_precision_k_10(self):
+    result = metrics_np.precision(self.actual, self.predicted, 10)
+    assert result == pytest.approx(0.3) # 3 out of 10
+
+class TestAveragePrecision:
+  def test_average_precision_basic(self):
+    result = metrics_np.average_precision(np.array([1,3,5]), np.array([1,2,3,4,5]), 5)
+    assert result == pytest.approx(0.7555555555555555) # (1 + 0.67 + 0.6) / 3
+
+  def test_average_precision_matches_core(self):
+    from ir_evaluation.metrics import average_precision
+
+    actual = TestRecallPrecision.actual
+    predicted = TestRecallPrecision.predicted
+    expected = average_precision(list(actual), list(predicted), 10)
+    result = metrics_np.average_precision(actual, predicted, 10)
+    assert result == pytest.approx(expected)
+
+  def test_average_precision_no_hits(self):
+    result = metrics_np.average_precision(np.array([1,2,3]), np.array([4,5,6,7,8]), 5)
+    assert result == pytest.approx(0.0)
+
+class TestSoaLayout:
+  def test_mean_average_precision_soa(self):
+    # actual lists: [1,3,5], [2,4,6], [7,8,9]
+    actual_flat = np.array([1, 3, 5, 2, 4, 6, 7, 8, 9])
+    actual_offsets = np.array([0, 3, 6, 9])
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3]
+    ])
+    result = metrics_np.mean_average_precision_soa(actual_flat, actual_offsets, predicted, 5)
+    # ap values: [0.7555555555555555, 0.5, 0.41666666666666663]
+    assert result == pytest.approx(0.5574074074074074)
+
+  def test_mean_reciprocal_rank_soa_bitset(self):
+    actual_flat = np.array([1, 3, 5, 2, 4, 6, 7, 8, 9])
+    actual_offsets = np.array([0, 3, 6, 9])
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3]
+    ])
+    result = metrics_np.mean_reciprocal_rank_soa(actual_flat, actual_offsets, predicted, 5, universe_size=10)
+    # rr values: [1.0, 0.5, 0.3333333]
+    assert result == pytest.approx(0.611111111111111)
+
+class TestBitsetPath:
+  def test_mean_average_precision_bitset(self):
+    actual_list = [
+      [1,3,5],
+      [2,4,6],
+      [7,8,9]
+    ]
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3]
+    ])
+    expected = metrics_np.mean_average_precision(actual_list, predicted, 5)
+    result = metrics_np.mean_average_precision(actual_list, predicted, 5, universe_size=10)
+    assert result == pytest.approx(expected)
+
+  def test_bitset_word_boundaries(self):
+    # IDs straddling uint64 word boundaries
+    actual_list = [[0, 63, 64, 127, 128]]
+    predicted = np.array([[128, 1, 63, 64, 200]])
+    result = metrics_np.mean_reciprocal_rank(actual_list, predicted, 5, universe_size=256)
+    assert result == pytest.approx(1.0)
+
+class TestMeanReciprocalRank:
+  def test_mean_reciprocal_rank_basic(self):
+    # same inputs as the pure python test
+    actual_list = [
+      [1,3,5],
+      [2,4,6],
+      [7,8,9],
+      [7,8,9]
+    ]
+
+    predicted = np.array([
+      [1,2,3,4,5],
+      [9,2,3,1,5],
+      [4,5,9,8,3],
+      [1,2,3,4,5]
+    ])
+    result = metrics_np.mean_reciprocal_rank(actual_list, predicted, 5)
+    # rr values: [1.0, 0.5, 0.333, 0]
+    assert result == pytest.approx(0.4583333333333333)
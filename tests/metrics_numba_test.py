@@ -0,0 +1,81 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ir_evaluation import metrics_numba
+
+# CSR-style batch layout shared by the kernels:
+# actual lists: [1,3,5], [2,4,6], [7,8,9]
+actual_flat = np.array([1, 3, 5, 2, 4, 6, 7, 8, 9], dtype=np.int32)
+actual_offsets = np.array([0, 3, 6, 9], dtype=np.int32)
+
+predicted = np.array([
+  [1, 2, 3, 4, 5],
+  [9, 2, 3, 1, 5],
+  [4, 5, 9, 8, 3]
+], dtype=np.int32)
+
+class TestApBatch:
+  def test_ap_batch(self):
+    result = metrics_numba.ap_batch(actual_flat, actual_offsets, predicted, 5)
+    expected = [0.7555555555555555, 0.5, 0.41666666666666663]
+    assert result == pytest.approx(expected, rel=1e-6)
+
+  def test_ap_batch_no_hits(self):
+    result = metrics_numba.ap_batch(
+      np.array([99], dtype=np.int32),
+      np.array([0, 1], dtype=np.int32),
+      np.array([[1, 2, 3, 4, 5]], dtype=np.int32),
+      5,
+    )
+    assert result == pytest.approx([0.0])
+
+class TestNdcgBatch:
+  def test_ndcg_batch(self):
+    result = metrics_numba.ndcg_batch(actual_flat, actual_offsets, predicted, 5)
+    # cross-checked against metrics.ndcg per query
+    from ir_evaluation.metrics import ndcg
+    actual_list = [[1, 3, 5], [2, 4, 6], [7, 8, 9]]
+    expected = [ndcg(a, list(p), 5) for a, p in zip(actual_list, predicted)]
+    assert result == pytest.approx(expected, rel=1e-6)
+
+  def test_ndcg_batch_predictions_narrower_than_k(self):
+    from ir_evaluation.metrics import ndcg
+
+    # the ideal DCG denominator must use min(k, |actual|), not the
+    # narrower prediction width
+    result = metrics_numba.ndcg_batch(
+      np.array([1, 2, 3, 4, 5], dtype=np.int32),
+      np.array([0, 5], dtype=np.int32),
+      np.array([[1, 2, 3]], dtype=np.int32),
+      5,
+    )
+    assert result[0] == pytest.approx(ndcg([1, 2, 3, 4, 5], [1, 2, 3], 5), rel=1e-6)
+
+class TestAllMetricsBatch:
+  def test_all_metrics_batch_matches_scalar(self):
+    from ir_evaluation.metrics import all_metrics
+
+    result = metrics_numba.all_metrics_batch(actual_flat, actual_offsets, predicted, 5)
+    actual_list = [[1, 3, 5], [2, 4, 6], [7, 8, 9]]
+    for q, (a, p) in enumerate(zip(actual_list, predicted)):
+      expected = all_metrics(a, list(p), 5)
+      for name, scores in result.items():
+        assert scores[q] == pytest.approx(expected[name], rel=1e-6)
+
+  def test_all_metrics_batch_predictions_narrower_than_k(self):
+    from ir_evaluation.metrics import ndcg
+
+    result = metrics_numba.all_metrics_batch(
+      np.array([1, 2, 3, 4, 5], dtype=np.int32),
+      np.array([0, 5], dtype=np.int32),
+      np.array([[1, 2, 3]], dtype=np.int32),
+      5,
+    )
+    assert result["ndcg"][0] == pytest.approx(ndcg([1, 2, 3, 4, 5], [1, 2, 3], 5), rel=1e-6)
+
+class TestRrBatch:
+  def test_rr_batch(self):
+    result = metrics_numba.rr_batch(actual_flat, actual_offsets, predicted, 5)
+    expected = [1.0, 0.5, 1.0 / 3.0]
+    assert result == pytest.approx(expected, rel=1e-6)
@@ -1,6 +1,7 @@
 import random
 import pytest
 from ir_evaluation.metrics import (
+    Evaluator,
     recall,
     precision,
     f1_score,
@@ -9,6 +10,7 @@ from ir_evaluation.metrics import (
     ndcg,
     reciprocal_rank,
     mean_reciprocal_rank,
+    all_metrics,
 )
 
 # Sample data generated with:
@@ -88,6 +90,11 @@ class TestAveragePrecision:
     result = average_precision(actual, predicted, 10)
     assert result == pytest.approx(0.30277777777777776)
 
+  def test_divide_by_relevant(self):
+    # 1 hit at rank 5 within k=5; denominator is min(k, |actual|) = 5
+    result = average_precision(actual, predicted, 5, divide_by_relevant=True)
+    assert result == pytest.approx(0.04)
+
 class TestMeanAveragePrecision:
   def test_mean_average_precision_basic(self):
     # basic inputs
@@ -115,6 +122,63 @@ class TestMeanAveragePrecision:
     # ap values: [0.8333333333333333, 1.0]
     assert result == pytest.approx(0.9166666666666666)
 
+class TestEvaluator:
+  def test_evaluator_matches_free_functions(self):
+    evaluator = Evaluator(actual)
+    assert evaluator.recall(predicted, 10) == pytest.approx(recall(actual, predicted, 10))
+    assert evaluator.precision(predicted, 10) == pytest.approx(precision(actual, predicted, 10))
+    assert evaluator.f1_score(predicted, 10) == pytest.approx(f1_score(actual, predicted, 10))
+    assert evaluator.average_precision(predicted, 10) == pytest.approx(average_precision(actual, predicted, 10))
+    assert evaluator.ndcg(predicted, 10) == pytest.approx(ndcg(actual, predicted, 10))
+    assert evaluator.reciprocal_rank(predicted, 10) == pytest.approx(reciprocal_rank(actual, predicted, 10))
+
+  def test_evaluator_accepts_ndarrays(self):
+    np = pytest.importorskip("numpy")
+    evaluator = Evaluator(np.array(actual))
+    np_predicted = np.array(predicted)
+    assert evaluator.recall(np_predicted, 10) == pytest.approx(recall(actual, predicted, 10))
+    assert evaluator.average_precision(np_predicted, 10) == pytest.approx(average_precision(actual, predicted, 10))
+    assert evaluator.ndcg(np_predicted, 10) == pytest.approx(ndcg(actual, predicted, 10))
+    assert evaluator.reciprocal_rank(np_predicted, 10) == pytest.approx(reciprocal_rank(actual, predicted, 10))
+
+  def test_evaluator_bitmap_matches_set_path(self):
+    # item IDs are all < 100, so a dense bitmap over [0, 100) is valid
+    evaluator = Evaluator(actual, universe_size=100)
+    assert evaluator.recall(predicted, 10) == pytest.approx(recall(actual, predicted, 10))
+    assert evaluator.precision(predicted, 10) == pytest.approx(precision(actual, predicted, 10))
+    assert evaluator.f1_score(predicted, 10) == pytest.approx(f1_score(actual, predicted, 10))
+    assert evaluator.average_precision(predicted, 10) == pytest.approx(average_precision(actual, predicted, 10))
+    assert evaluator.ndcg(predicted, 10) == pytest.approx(ndcg(actual, predicted, 10))
+    assert evaluator.reciprocal_rank(predicted, 10) == pytest.approx(reciprocal_rank(actual, predicted, 10))
+
+class TestAllMetrics:
+  def test_all_metrics_matches_individual_functions(self):
+    result = all_metrics(actual, predicted, 10)
+    assert result["recall"] == pytest.approx(recall(actual, predicted, 10))
+    assert result["precision"] == pytest.approx(precision(actual, predicted, 10))
+    assert result["f1_score"] == pytest.approx(f1_score(actual, predicted, 10))
+    assert result["average_precision"] == pytest.approx(average_precision(actual, predicted, 10))
+    assert result["ndcg"] == pytest.approx(ndcg(actual, predicted, 10))
+    assert result["reciprocal_rank"] == pytest.approx(reciprocal_rank(actual, predicted, 10))
+
+  def test_all_metrics_k_beyond_predicted_length(self):
+    # len(predicted) < k takes the generic loop instead of the unrolled scan
+    result = all_metrics(actual, predicted, 20)
+    assert result["recall"] == pytest.approx(recall(actual, predicted, 20))
+    assert result["precision"] == pytest.approx(precision(actual, predicted, 20))
+    assert result["average_precision"] == pytest.approx(average_precision(actual, predicted, 20))
+    assert result["ndcg"] == pytest.approx(ndcg(actual, predicted, 20))
+    assert result["reciprocal_rank"] == pytest.approx(reciprocal_rank(actual, predicted, 20))
+
+  def test_all_metrics_no_hits(self):
+    result = all_metrics([1,2,3], [4,5,6,7,8], 5)
+    assert result["recall"] == pytest.approx(0.0)
+    assert result["precision"] == pytest.approx(0.0)
+    assert result["f1_score"] == pytest.approx(0.0)
+    assert result["average_precision"] == pytest.approx(0.0)
+    assert result["ndcg"] == pytest.approx(0.0)
+    assert result["reciprocal_rank"] == pytest.approx(0.0)
+
 class TestNCDG:
   def test_ndcg_k_5(self):
     result = ndcg(actual, predicted, 5)
@@ -124,6 +188,10 @@ class TestNCDG:
     result = ndcg(actual, predicted, 10)
     assert result == pytest.approx(0.23297260855707355)
 
+  def test_ndcg_empty_actual(self):
+    result = ndcg([], predicted, 10)
+    assert result == pytest.approx(0.0) # ideal DCG is zero
+
 class TestReciprocalRank:
   def test_reciprocal_rank_k_10(self):
     result = reciprocal_rank(actual, predicted, 10)